@@ -4,22 +4,28 @@ Direct comparison: Geometry (ours) vs Correction (QLDPC-style)
 Tests both approaches across exponential pool sizes.
 """
 
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 from entanglement_engine import entanglement_params, T
-from fault_tolerance import build_crystal_adjacency
+from entanglement_engine.kernels import (
+    kuramoto_step, run_waves_gpu, set_kernel_threads, HAS_CUDA, GPU_MIN_POOL,
+)
+from fault_tolerance import build_crystal_adjacency, build_pool_adjacency
 
 
-def coherence(phases):
-    """Kuramoto order parameter."""
-    return np.abs(np.mean(np.exp(1j * phases)))
+_rng = np.random.default_rng()
 
 
-def run_geometry(pool_size: int, max_steps: int = 100, target: float = 0.9) -> dict:
+def run_geometry(pool_size: int, max_steps: int = 100, target: float = 0.9,
+                 seed: int = None) -> dict:
     """
     Our approach: frozen seed + Kuramoto coupling + 3-6-9 rhythm.
     
     Returns: steps, final_coherence, corrections (always 0)
     """
+    rng = _rng if seed is None else np.random.default_rng(seed)
     params = entanglement_params(pool_size)
     K, V, amplitude = params['K'], params['V'], params['amplitude']
     rhythm = params['rhythm']
@@ -28,70 +34,61 @@ def run_geometry(pool_size: int, max_steps: int = 100, target: float = 0.9) -> d
     n_total = n_frozen + pool_size
     
     # Initialize: frozen at 0, pool random
-    phases = np.zeros(n_total)
-    phases[n_frozen:] = np.random.uniform(0, 2*np.pi, pool_size)
+    phases = np.zeros(n_total, dtype=np.float32)
+    phases[n_frozen:] = rng.uniform(0, 2*np.pi, pool_size)
     
     # Build adjacency
-    adj = {i: list(frozen_adj[i]) for i in range(n_frozen)}
-    for i in range(n_frozen, n_total):
-        adj[i] = []
-    
-    # Frozen-fluid contacts
-    n_contacts = max(1, int(pool_size * 0.1))
-    for i in range(n_frozen, n_total):
-        contacts = np.random.choice(n_frozen, size=min(n_contacts, n_frozen), replace=False)
-        for c in contacts:
-            adj[i].append(c)
-            adj[c].append(i)
-    
-    # Fluid-fluid sparse mesh
-    fluid_nodes = list(range(n_frozen, n_total))
-    for _ in range(pool_size * 2):
-        if len(fluid_nodes) >= 2:
-            i, j = np.random.choice(fluid_nodes, size=2, replace=False)
-            if j not in adj[i]:
-                adj[i].append(j)
-                adj[j].append(i)
+    indptr, indices = build_pool_adjacency(n_frozen, frozen_adj, pool_size, rng)
     
     frozen_mask = np.zeros(n_total, dtype=bool)
     frozen_mask[:n_frozen] = True
     
+    # Rhythm pulse targets by layer (center, triad, icosa); missing layers are empty.
+    # Pulse step alternates sign every 12-beat cycle
+    pulse_targets = [np.array(layer_indices.get(key, []), dtype=np.int64)
+                     for key in ('center', 'triad', 'icosa')]
+    pulse_step = np.array([amplitude, -amplitude], dtype=np.float32)
+    
+    if HAS_CUDA and pool_size >= GPU_MIN_POOL:
+        steps, c, success = run_waves_gpu(phases, indptr, indices, n_frozen,
+                                          pulse_targets, pulse_step, rhythm,
+                                          max_steps, target)
+        return {'steps': steps, 'coherence': c, 'corrections': 0, 'success': success}
+    
+    # Running sum(exp(1j * phases)): seed part tracks pulse deltas,
+    # fluid part comes back from the fused Kuramoto step
+    seed_sum = np.exp(1j * phases[:n_frozen]).sum(dtype=np.complex128)
+    csum = seed_sum + np.exp(1j * phases[n_frozen:]).sum(dtype=np.complex128)
+    
+    # Ping-pong buffer: the Kuramoto step writes every fluid entry, so
+    # only the seed slice is carried over before each pulse
+    new_phases = np.empty_like(phases)
+    sincos = np.empty((n_total, 2), dtype=np.float32)  # Kuramoto step scratch
+    
     # Run dynamics
     for step in range(max_steps):
-        c = coherence(phases)
+        c = abs(csum) / n_total
         if c >= target:
             return {'steps': step + 1, 'coherence': c, 'corrections': 0, 'success': True}
         
-        new_phases = phases.copy()
+        new_phases[:n_frozen] = phases[:n_frozen]
         
         # Rhythm pulse to frozen seed
-        beat_idx = step % 12
-        active_layer = rhythm[beat_idx][1]
-        layer_keys = ['center', 'triad', 'icosa']
-        if active_layer < len(layer_keys):
-            layer_key = layer_keys[active_layer]
-            if layer_key in layer_indices:
-                for i in layer_indices[layer_key]:
-                    direction = 1 if (step // 12) % 2 == 0 else -1
-                    new_phases[i] = (phases[i] + direction * amplitude) % (2 * np.pi)
+        tgt = pulse_targets[rhythm[step % 12][1]]
+        new_phases[tgt] = (phases[tgt] + pulse_step[(step // 12) & 1]) % (2 * np.pi)
+        seed_sum += (np.exp(1j * new_phases[tgt]) - np.exp(1j * phases[tgt])).sum(dtype=np.complex128)
         
         # Kuramoto coupling for fluid
-        for i in range(n_total):
-            if frozen_mask[i]:
-                continue
-            neighbors = adj[i]
-            if neighbors:
-                phase_diff_sum = sum(np.sin(phases[j] - phases[i]) for j in neighbors)
-                new_phases[i] = phases[i] + 0.1 + (0.3 / len(neighbors)) * phase_diff_sum
-                new_phases[i] = new_phases[i] % (2 * np.pi)
+        csum = seed_sum + kuramoto_step(phases, new_phases, indptr, indices, frozen_mask, sincos)
         
-        phases = new_phases
+        phases, new_phases = new_phases, phases
     
-    return {'steps': max_steps, 'coherence': coherence(phases), 'corrections': 0, 'success': False}
+    return {'steps': max_steps, 'coherence': abs(csum) / n_total, 'corrections': 0, 'success': False}
 
 
 def run_correction(pool_size: int, max_steps: int = 100, target: float = 0.9,
-                   threshold: float = 0.5, strength: float = 0.3) -> dict:
+                   threshold: float = 0.5, strength: float = 0.3,
+                   seed: int = None) -> dict:
     """
     QLDPC-style: pure active error correction.
     
@@ -103,44 +100,60 @@ def run_correction(pool_size: int, max_steps: int = 100, target: float = 0.9,
     
     Returns: steps, final_coherence, corrections (total count)
     """
+    rng = _rng if seed is None else np.random.default_rng(seed)
+    
+    # Match the float32 phases so no step promotes to float64
+    threshold, strength = np.float32(threshold), np.float32(strength)
+    pi, tau = np.float32(np.pi), np.float32(2 * np.pi)
+    
     # Initialize all random
-    phases = np.random.uniform(0, 2*np.pi, pool_size)
-    reference = 0.0  # Target phase
+    phases = rng.uniform(0, 2*np.pi, pool_size).astype(np.float32)
+    reference = np.float32(0.0)  # Target phase
+    
+    # Corrections applied at each step, summed once on return
+    corrections = np.zeros(max_steps, dtype=np.int64)
     
-    total_corrections = 0
+    # Running sum(exp(1j * phases)), updated only where corrections land
+    csum = np.exp(1j * phases).sum(dtype=np.complex128)
     
     for step in range(max_steps):
-        c = coherence(phases)
+        c = abs(csum) / pool_size
         if c >= target:
-            return {'steps': step + 1, 'coherence': c, 'corrections': total_corrections, 'success': True}
+            return {'steps': step + 1, 'coherence': c, 'corrections': int(corrections.sum()), 'success': True}
         
-        new_phases = phases.copy()
-        step_corrections = 0
+        # Pure error correction: check every node against reference
+        error = phases - reference
+        error += pi
+        error %= tau
+        error -= pi  # Wrap to [-π, π]
+        mask = np.abs(error) > threshold
+        before = phases[mask]
         
-        # Pure error correction: check each node against reference
-        for i in range(pool_size):
-            # Wrap-aware error
-            error = phases[i] - reference
-            error = (error + np.pi) % (2 * np.pi) - np.pi  # Wrap to [-π, π]
-            
-            if abs(error) > threshold:
-                # Apply correction pulse
-                new_phases[i] = phases[i] - strength * np.sign(error)
-                new_phases[i] = new_phases[i] % (2 * np.pi)
-                step_corrections += 1
+        # Apply correction pulse, branchless: sign(error) zeroed off the mask
+        np.sign(error, out=error)
+        error *= mask
+        error *= strength
+        phases -= error
+        phases %= tau
+        csum += (np.exp(1j * phases[mask]) - np.exp(1j * before)).sum(dtype=np.complex128)
         
         # NO Kuramoto coupling — pure active correction only
         
-        phases = new_phases
-        total_corrections += step_corrections
+        corrections[step] = np.count_nonzero(mask)
     
-    return {'steps': max_steps, 'coherence': coherence(phases), 'corrections': total_corrections, 'success': False}
+    return {'steps': max_steps, 'coherence': abs(csum) / pool_size, 'corrections': int(corrections.sum()), 'success': False}
 
 
-def compare(max_pool: int, trials: int = 3):
+def compare(max_pool: int, trials: int = 3, workers: int = None, seed: int = None):
     """
     Compare both approaches across exponential pool sizes.
+    
+    Trials run in parallel across `workers` processes (default: all cores);
+    pools of GPU_MIN_POOL and above run one trial at a time in this process.
+    A `seed` fixes the per-trial seeds, making the whole comparison
+    reproducible.
     """
+    rng = _rng if seed is None else np.random.default_rng(seed)
     # Generate test points with finer granularity
     pool_sizes = []
     for exp in range(2, 20):
@@ -164,50 +177,68 @@ def compare(max_pool: int, trials: int = 3):
     
     results = []
     
-    for pool in pool_sizes:
-        params = entanglement_params(pool)  # Get our params for this pool size
-        geo_steps, geo_coh, geo_corr = [], [], []
-        cor_steps, cor_coh, cor_corr = [], [], []
-        
-        for _ in range(trials):
+    # Spawn workers when a CUDA context is live; it does not survive fork
+    ctx = multiprocessing.get_context('spawn') if HAS_CUDA else None
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=set_kernel_threads, initargs=(1,)) as ex:
+        for pool in pool_sizes:
+            params = entanglement_params(pool)  # Get our params for this pool size
+            geo_steps, geo_coh, geo_corr = [], [], []
+            cor_steps, cor_coh, cor_corr = [], [], []
+            
+            # Independent trials, each on its own seeded generator
+            seeds = rng.integers(2**63, size=2 * trials).tolist()
+            if pool < GPU_MIN_POOL:
+                geo_futures = [ex.submit(run_geometry, pool, seed=s) for s in seeds[:trials]]
+                cor_futures = [ex.submit(run_correction, pool, seed=s) for s in seeds[trials:]]
+                geo_runs = [f.result() for f in geo_futures]
+                cor_runs = [f.result() for f in cor_futures]
+            else:
+                # Sizes ascend, so the small-pool workers are done: release
+                # them, then run large trials one at a time here (memory
+                # grows with the pool; the GPU path wants one CUDA context)
+                ex.shutdown()
+                geo_runs = [run_geometry(pool, seed=s) for s in seeds[:trials]]
+                cor_runs = [run_correction(pool, seed=s) for s in seeds[trials:]]
+            
             # Our approach
-            g = run_geometry(pool)
-            geo_steps.append(g['steps'])
-            geo_coh.append(g['coherence'])
-            geo_corr.append(g['corrections'])
+            for g in geo_runs:
+                geo_steps.append(g['steps'])
+                geo_coh.append(g['coherence'])
+                geo_corr.append(g['corrections'])
             
             # Their approach
-            c = run_correction(pool)
-            cor_steps.append(c['steps'])
-            cor_coh.append(c['coherence'])
-            cor_corr.append(c['corrections'])
-        
-        geo = {
-            'steps': np.mean(geo_steps),
-            'coherence': np.mean(geo_coh),
-            'corrections': np.mean(geo_corr),
-        }
-        cor = {
-            'steps': np.mean(cor_steps),
-            'coherence': np.mean(cor_coh),
-            'corrections': np.mean(cor_corr),
-        }
-        
-        # Real comparison: their corrections vs our seed size
-        geo_seed = params['V']  # Our frozen seed size
-        cor_work = cor['corrections']
-        ratio = cor_work / geo_seed if geo_seed > 0 else float('inf')
-        
-        print(f"{pool:>10,} | {geo['steps']:>8.1f} {geo['coherence']:>6.3f} {geo_seed:>8} | "
-              f"{cor['steps']:>8.1f} {cor['coherence']:>6.3f} {cor_work:>10.0f}  {ratio:>6.0f}:1")
-        
-        results.append({
-            'pool': pool,
-            'geometry': geo,
-            'correction': cor,
-            'seed': params['V'],
-            'ratio': cor['corrections'] / params['V'] if params['V'] > 0 else 0,
-        })
+            for c in cor_runs:
+                cor_steps.append(c['steps'])
+                cor_coh.append(c['coherence'])
+                cor_corr.append(c['corrections'])
+            
+            geo = {
+                'steps': np.mean(geo_steps),
+                'coherence': np.mean(geo_coh),
+                'corrections': np.mean(geo_corr),
+            }
+            cor = {
+                'steps': np.mean(cor_steps),
+                'coherence': np.mean(cor_coh),
+                'corrections': np.mean(cor_corr),
+            }
+            
+            # Real comparison: their corrections vs our seed size
+            geo_seed = params['V']  # Our frozen seed size
+            cor_work = cor['corrections']
+            ratio = cor_work / geo_seed if geo_seed > 0 else float('inf')
+            
+            print(f"{pool:>10,} | {geo['steps']:>8.1f} {geo['coherence']:>6.3f} {geo_seed:>8} | "
+                  f"{cor['steps']:>8.1f} {cor['coherence']:>6.3f} {cor_work:>10.0f}  {ratio:>6.0f}:1")
+            
+            results.append({
+                'pool': pool,
+                'geometry': geo,
+                'correction': cor,
+                'seed': params['V'],
+                'ratio': cor['corrections'] / params['V'] if params['V'] > 0 else 0,
+            })
     
     print()
     print("=" * 90)
@@ -235,4 +266,6 @@ if __name__ == '__main__':
     import sys
     max_pool = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
     trials = int(sys.argv[2]) if len(sys.argv) > 2 else 3
-    compare(max_pool, trials)
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else None
+    compare(max_pool, trials, workers, seed)
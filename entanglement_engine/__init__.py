@@ -38,6 +38,11 @@ from .simulate import (
     build_crystal_adjacency,
 )
 
+from .kernels import (
+    HAS_NUMBA,
+    kuramoto_step,
+)
+
 __all__ = [
     'T',
     'crystal_vertices',
@@ -47,4 +52,6 @@ __all__ = [
     'entanglement_params',
     'test_fault_tolerance',
     'build_crystal_adjacency',
+    'HAS_NUMBA',
+    'kuramoto_step',
 ]
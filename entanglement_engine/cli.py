@@ -24,6 +24,7 @@ def main():
     p_test.add_argument('pool', type=int, help='Pool size')
     p_test.add_argument('--trials', type=int, default=5, help='Number of trials')
     p_test.add_argument('--corruption', type=float, default=0.5, help='Corruption fraction')
+    p_test.add_argument('--seed', type=int, default=None, help='RNG seed for reproducible trials')
     p_test.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
     p_test.add_argument('--json', action='store_true', help='Output as JSON')
 
@@ -50,7 +51,8 @@ def main():
             args.pool,
             corruption=args.corruption,
             trials=args.trials,
-            verbose=args.verbose
+            verbose=args.verbose,
+            seed=args.seed
         )
         if args.json:
             print(json.dumps(result, indent=2))
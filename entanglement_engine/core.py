@@ -110,6 +110,13 @@ def optimal_K(pool: int) -> int:
 # RHYTHM
 # =============================================================================
 
+_RHYTHM = (
+    (1, 0), (2, 1), (3, 2), (4, 0),
+    (5, 1), (6, 2), (7, 0), (8, 1),
+    (9, 2), (10, 0), (11, 1), (12, 2)
+)
+
+
 def rhythm_sequence() -> list:
     """
     3-6-9 pulse pattern with nested loop.
@@ -117,11 +124,7 @@ def rhythm_sequence() -> list:
     Returns: [(beat, layer_index), ...] for 12-beat cycle
     Layer: 0=center, 1=triad, 2=icosa
     """
-    return [
-        (1, 0), (2, 1), (3, 2), (4, 0),
-        (5, 1), (6, 2), (7, 0), (8, 1),
-        (9, 2), (10, 0), (11, 1), (12, 2)
-    ]
+    return list(_RHYTHM)
 
 
 def optimal_amplitude(pool: int) -> float:
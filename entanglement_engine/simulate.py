@@ -4,8 +4,15 @@ Fault tolerance testing for Entanglement Engine.
 Tests recovery from 50% pool corruption using optimized geometry + rhythm.
 """
 
+import functools
+import itertools
+
 import numpy as np
 from .core import entanglement_params, crystal_vertices
+from .kernels import kuramoto_step, run_waves_gpu, HAS_CUDA, GPU_MIN_POOL
+
+
+_rng = np.random.default_rng()
 
 
 def icosahedron_vertices():
@@ -42,7 +49,20 @@ def fibonacci_sphere(n, radius):
 
 
 def build_crystal_adjacency(K: int):
-    """Build adjacency dict for K-layer crystal."""
+    """
+    Build adjacency dict for K-layer crystal.
+    
+    The neighbour search runs once per K per process; later calls only
+    copy the cached tuples into fresh, caller-owned dicts and lists.
+    """
+    n, adj, layer_indices = _crystal_adjacency(K)
+    return (n, {i: list(nbrs) for i, nbrs in enumerate(adj)},
+            {key: list(idx) for key, idx in layer_indices})
+
+
+@functools.lru_cache(maxsize=None)
+def _crystal_adjacency(K: int):
+    """Crystal for K layers, built once per process as immutable tuples."""
     positions = [(0, 0, 0)]
     layer_indices = {'center': [0]}
     
@@ -65,32 +85,112 @@ def build_crystal_adjacency(K: int):
         radius += 0.15
     
     n = len(positions)
-    adj = {i: [] for i in range(n)}
     
-    def dist(i, j):
-        return np.sqrt(sum((positions[i][k] - positions[j][k])**2 for k in range(3)))
+    # 6 nearest neighbours among non-center vertices; stable sort breaks
+    # icosahedral distance ties by index
+    pos = np.asarray(positions[1:], dtype=float)
+    d2 = ((pos[:, None, :] - pos[None, :, :]) ** 2).sum(axis=-1)
+    np.fill_diagonal(d2, np.inf)
+    nearest = np.argsort(d2, axis=1, kind='stable')[:, :6] + 1
     
-    for i in range(1, n):
-        adj[0].append(i)
-        adj[i].append(0)
+    # Undirected edges packed as lo*n + hi; center joins every vertex
+    src = np.repeat(np.arange(1, n), 6)
+    dst = nearest.ravel()
+    edges = np.unique(np.concatenate([
+        np.arange(1, n),
+        np.minimum(src, dst) * n + np.maximum(src, dst),
+    ]))
     
-    for i in range(1, n):
-        dists = [(dist(i, j), j) for j in range(1, n) if j != i]
-        dists.sort()
-        for _, j in dists[:6]:
-            if j not in adj[i]:
-                adj[i].append(j)
-                adj[j].append(i)
+    adj = [[] for _ in range(n)]
+    for lo, hi in zip(*np.divmod(edges, n)):
+        adj[int(lo)].append(int(hi))
+        adj[int(hi)].append(int(lo))
     
-    for i in range(n):
-        adj[i] = list(set(adj[i]))
+    return (n, tuple(tuple(nbrs) for nbrs in adj),
+            tuple((key, tuple(idx)) for key, idx in layer_indices.items()))
+
+
+def adjacency_csr(adj: dict, n: int):
+    """Pack adjacency dict into CSR arrays (indptr, indices)."""
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    indptr[1:] = np.fromiter(itertools.accumulate(len(adj[i]) for i in range(n)),
+                             dtype=np.int64, count=n)
+    indices = np.fromiter(itertools.chain.from_iterable(adj[i] for i in range(n)),
+                          dtype=np.int64, count=indptr[-1])
+    return indptr, indices
+
+
+def _csr_rows(src, dst, n: int):
+    """Group an edge list by source row into CSR arrays (indptr, indices)."""
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    return indptr, dst[np.argsort(src, kind='stable')]
+
+
+def _csr_hstack(a_ptr, a_idx, b_ptr, b_idx):
+    """Row-wise concatenation of two CSR arrays with the same row count."""
+    indices = np.empty(len(a_idx) + len(b_idx), dtype=np.int32)
+    # Row r is A's row r then B's row r: each entry shifts by the
+    # other array's entries in rows before (A) or up to (B) row r
+    pos = np.repeat(b_ptr[:-1], np.diff(a_ptr))
+    pos += np.arange(len(a_idx))
+    indices[pos] = a_idx
+    pos = np.repeat(a_ptr[1:], np.diff(b_ptr))
+    pos += np.arange(len(b_idx))
+    indices[pos] = b_idx
+    return a_ptr + b_ptr, indices
+
+
+def build_pool_adjacency(n_frozen: int, frozen_adj: dict, pool_size: int,
+                         rng: np.random.Generator = None):
+    """
+    CSR adjacency (indptr, indices) for crystal + fluid pool.
+    
+    Fluid nodes follow the crystal. Each links to max(1, pool/10) distinct
+    seed vertices (at most the whole seed), plus a random sparse
+    fluid-fluid mesh of ~2 edges per node. Draws from rng (default: the
+    module generator).
+    """
+    rng = _rng if rng is None else rng
+    n_total = n_frozen + pool_size
+    fluid = np.arange(n_frozen, n_total, dtype=np.int32)
     
-    return n, adj, layer_indices
+    crystal_ptr, crystal_dst = adjacency_csr(frozen_adj, n_frozen)
+    
+    # Frozen-fluid contacts: a random subset of the seed per fluid node,
+    # plus the reverse lists (fluid nodes touching each seed vertex)
+    n_contacts = min(max(1, int(pool_size * 0.1)), n_frozen)
+    if n_contacts == n_frozen:
+        contacts = np.tile(np.arange(n_frozen, dtype=np.int32), pool_size)
+        reverse_ptr = pool_size * np.arange(n_frozen + 1)
+        reverse_idx = np.tile(fluid, n_frozen)
+    else:
+        draws = rng.random((pool_size, n_frozen))
+        contacts = draws.argpartition(n_contacts - 1, axis=1)[:, :n_contacts].astype(np.int32).ravel()
+        reverse_ptr, reverse_idx = _csr_rows(contacts, np.repeat(fluid, n_contacts), n_frozen)
+    
+    # Fluid-fluid sparse mesh: one draw, self-loops dropped, undirected
+    # duplicates removed on packed lo*n + hi ids
+    pairs = rng.integers(n_frozen, n_total, size=(pool_size * 2, 2))
+    lo, hi = pairs.min(axis=1), pairs.max(axis=1)
+    keep = lo != hi
+    mesh_lo, mesh_hi = np.divmod(np.unique(lo[keep] * n_total + hi[keep]), n_total)
+    mesh_ptr, mesh_idx = _csr_rows(np.concatenate([mesh_lo, mesh_hi]) - n_frozen,
+                                   np.concatenate([mesh_hi, mesh_lo]).astype(np.int32), pool_size)
+    
+    # Assemble rows from two blocks each, no global sort over all edges:
+    #   seed rows:  crystal neighbours | fluid contacts
+    #   fluid rows: seed contacts      | mesh neighbours
+    a_ptr = np.concatenate([crystal_ptr, crystal_ptr[-1] + n_contacts * np.arange(1, pool_size + 1)])
+    b_ptr = np.concatenate([reverse_ptr, reverse_ptr[-1] + mesh_ptr[1:]])
+    return _csr_hstack(a_ptr, np.concatenate([crystal_dst.astype(np.int32), contacts]),
+                       b_ptr, np.concatenate([reverse_idx, mesh_idx]))
 
 
 def test_fault_tolerance(pool_size: int, corruption: float = 0.5, 
                          max_steps: int = 100, target: float = 0.9,
-                         trials: int = 5, verbose: bool = False) -> dict:
+                         trials: int = 5, verbose: bool = False,
+                         seed: int = None) -> dict:
     """
     Test fault tolerance of optimized network.
     
@@ -101,6 +201,7 @@ def test_fault_tolerance(pool_size: int, corruption: float = 0.5,
         target: Target coherence (default 0.9)
         trials: Number of trials to average
         verbose: Print progress
+        seed: RNG seed for reproducible trials (default: module generator)
     
     Returns:
         dict with results
@@ -110,6 +211,8 @@ def test_fault_tolerance(pool_size: int, corruption: float = 0.5,
     rhythm = params['rhythm']
     
     n_frozen, frozen_adj, layer_indices = build_crystal_adjacency(K)
+    rng = _rng if seed is None else np.random.default_rng(seed)
+    use_gpu = HAS_CUDA and pool_size >= GPU_MIN_POOL
     
     results = []
     
@@ -118,59 +221,53 @@ def test_fault_tolerance(pool_size: int, corruption: float = 0.5,
             print(f"  Trial {trial+1}/{trials}...", end=" ", flush=True)
         
         n_total = n_frozen + pool_size
-        phases = np.zeros(n_total)
-        phases[n_frozen:] = np.random.uniform(0, 2*np.pi, pool_size)
-        
-        adj = {i: list(frozen_adj[i]) for i in range(n_frozen)}
-        for i in range(n_frozen, n_total):
-            adj[i] = []
+        phases = np.zeros(n_total, dtype=np.float32)
+        phases[n_frozen:] = rng.uniform(0, 2*np.pi, pool_size)
         
-        n_contacts = max(1, int(pool_size * 0.1))
-        for i in range(n_frozen, n_total):
-            contacts = np.random.choice(n_frozen, size=min(n_contacts, n_frozen), replace=False)
-            for c in contacts:
-                adj[i].append(c)
-                adj[c].append(i)
-        
-        fluid_nodes = list(range(n_frozen, n_total))
-        for _ in range(pool_size * 2):
-            if len(fluid_nodes) >= 2:
-                i, j = np.random.choice(fluid_nodes, size=2, replace=False)
-                if j not in adj[i]:
-                    adj[i].append(j)
-                    adj[j].append(i)
+        indptr, indices = build_pool_adjacency(n_frozen, frozen_adj, pool_size, rng)
         
         frozen_mask = np.zeros(n_total, dtype=bool)
         frozen_mask[:n_frozen] = True
         
+        # Rhythm pulse targets by layer (center, triad, icosa); missing layers are empty.
+        # Pulse step alternates sign every 12-beat cycle
+        pulse_targets = [np.array(layer_indices.get(key, []), dtype=np.int64)
+                         for key in ('center', 'triad', 'icosa')]
+        pulse_step = np.array([amplitude, -amplitude], dtype=np.float32)
+        
+        if use_gpu:
+            steps, c, success = run_waves_gpu(phases, indptr, indices, n_frozen,
+                                              pulse_targets, pulse_step, rhythm,
+                                              max_steps, target)
+            results.append({'steps': steps, 'coherence': c, 'success': success})
+            if verbose:
+                print(f"✓ step {steps}" if success else "✗ max steps")
+            continue
+        
+        # Running sum(exp(1j * phases)): seed part tracks pulse deltas,
+        # fluid part comes back from the fused Kuramoto step
+        seed_sum = np.exp(1j * phases[:n_frozen]).sum(dtype=np.complex128)
+        csum = seed_sum + np.exp(1j * phases[n_frozen:]).sum(dtype=np.complex128)
+        
+        # Ping-pong buffer: the Kuramoto step writes every fluid entry, so
+        # only the seed slice is carried over before each pulse
+        new_phases = np.empty_like(phases)
+        sincos = np.empty((n_total, 2), dtype=np.float32)  # Kuramoto step scratch
+        
         def coherence():
-            return np.abs(np.mean(np.exp(1j * phases)))
+            return abs(csum) / n_total
         
         def wave_step(step):
-            nonlocal phases
-            new_phases = phases.copy()
-            
-            beat_idx = step % 12
-            active_layer = rhythm[beat_idx][1]
+            nonlocal phases, new_phases, seed_sum, csum
+            new_phases[:n_frozen] = phases[:n_frozen]
             
-            layer_keys = ['center', 'triad', 'icosa']
-            if active_layer < len(layer_keys):
-                layer_key = layer_keys[active_layer]
-                if layer_key in layer_indices:
-                    for i in layer_indices[layer_key]:
-                        direction = 1 if (step // 12) % 2 == 0 else -1
-                        new_phases[i] = (phases[i] + direction * amplitude) % (2 * np.pi)
+            tgt = pulse_targets[rhythm[step % 12][1]]
+            new_phases[tgt] = (phases[tgt] + pulse_step[(step // 12) & 1]) % (2 * np.pi)
+            seed_sum += (np.exp(1j * new_phases[tgt]) - np.exp(1j * phases[tgt])).sum(dtype=np.complex128)
             
-            for i in range(n_total):
-                if frozen_mask[i]:
-                    continue
-                neighbors = adj[i]
-                if neighbors:
-                    phase_diff_sum = sum(np.sin(phases[j] - phases[i]) for j in neighbors)
-                    new_phases[i] = phases[i] + 0.1 + (0.3 / len(neighbors)) * phase_diff_sum
-                    new_phases[i] = new_phases[i] % (2 * np.pi)
+            csum = seed_sum + kuramoto_step(phases, new_phases, indptr, indices, frozen_mask, sincos)
             
-            phases = new_phases
+            phases, new_phases = new_phases, phases
         
         for step in range(max_steps):
             c = coherence()
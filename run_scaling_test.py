@@ -6,24 +6,50 @@ Usage:
     python3 run_scaling_test.py
     python3 run_scaling_test.py --max-pool 100000 --trials 10
     python3 run_scaling_test.py --output results.json
+    python3 run_scaling_test.py --seed 42     # reproducible run
+    python3 run_scaling_test.py --workers 1   # one pool size at a time (low memory)
     
     nohup python3 run_scaling_test.py --max-pool 1000000 > scaling.log 2>&1 &
 """
 
 import argparse
 import json
+import multiprocessing
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+
+import numpy as np
 from fault_tolerance import test_fault_tolerance
 from entanglement_engine import entanglement_params
+from entanglement_engine.kernels import set_kernel_threads, HAS_CUDA, GPU_MIN_POOL
+
+
+_rng = np.random.default_rng()
+
+
+def _timed_test(pool: int, trials: int, seed: int) -> dict:
+    """Run one pool size in a worker process on its own RNG stream."""
+    t0 = time.time()
+    r = test_fault_tolerance(pool, trials=trials, verbose=False, seed=seed)
+    r['test_time_sec'] = time.time() - t0
+    return r
 
 
 def run_scaling_test(max_pool: int = 100000, trials: int = 5, 
-                     output: str = None, verbose: bool = True):
+                     output: str = None, verbose: bool = True,
+                     workers: int = None, seed: int = None):
     """
     Run scaling test across pool sizes.
     
     Tests: 50, 100, 200, 500, 1K, 2K, 5K, 10K, 20K, 50K, 100K, ...
+    
+    Pool sizes below GPU_MIN_POOL run in parallel across `workers`
+    processes (default: one per core, at most one per pool size). Larger
+    pools then run one at a time in this process, so peak memory stays
+    that of the largest pool. A `seed` fixes the per-pool seeds, making
+    the whole run reproducible.
     """
     # Generate test points: geometric progression
     pool_sizes = []
@@ -56,14 +82,14 @@ def run_scaling_test(max_pool: int = 100000, trials: int = 5,
     results = []
     start_time = time.time()
     
-    for i, pool in enumerate(pool_sizes):
-        print(f"[{i+1}/{len(pool_sizes)}] Pool {pool:>10,}...", flush=True)
-        
-        t0 = time.time()
-        r = test_fault_tolerance(pool, trials=trials, verbose=False)
-        elapsed = time.time() - t0
-        
-        r['test_time_sec'] = elapsed
+    n_small = sum(pool < GPU_MIN_POOL for pool in pool_sizes)
+    if workers is None:
+        workers = max(1, min(os.cpu_count() or 1, n_small))
+    rng = _rng if seed is None else np.random.default_rng(seed)
+    seeds = rng.integers(2**63, size=len(pool_sizes)).tolist()
+    
+    def record(r):
+        elapsed = r['test_time_sec']
         results.append(r)
         
         status = "✓" if r['success_rate'] == 1.0 else "✗"
@@ -85,6 +111,20 @@ def run_scaling_test(max_pool: int = 100000, trials: int = 5,
                     'results': results
                 }, f, indent=2)
     
+    # Spawn workers when a CUDA context is live; it does not survive fork
+    ctx = multiprocessing.get_context('spawn') if HAS_CUDA else None
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=set_kernel_threads, initargs=(1,)) as ex:
+        runs = ex.map(_timed_test, pool_sizes[:n_small], [trials] * n_small, seeds[:n_small])
+        for i, (pool, r) in enumerate(zip(pool_sizes, runs)):
+            print(f"[{i+1}/{len(pool_sizes)}] Pool {pool:>10,}...", flush=True)
+            record(r)
+    
+    # Large pools one at a time, once the workers have exited
+    for i in range(n_small, len(pool_sizes)):
+        print(f"[{i+1}/{len(pool_sizes)}] Pool {pool_sizes[i]:>10,}...", flush=True)
+        record(_timed_test(pool_sizes[i], trials, seeds[i]))
+    
     total_time = time.time() - start_time
     
     print()
@@ -137,11 +177,18 @@ if __name__ == '__main__':
                         help='Trials per pool size (default: 5)')
     parser.add_argument('--output', '-o', type=str, default='scaling_results.json',
                         help='Output JSON file (default: scaling_results.json)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Parallel worker processes for pools below 50,000 '
+                             '(default: one per core)')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='RNG seed for a reproducible run (default: unseeded)')
     
     args = parser.parse_args()
     
     run_scaling_test(
         max_pool=args.max_pool,
         trials=args.trials,
-        output=args.output
+        output=args.output,
+        workers=args.workers,
+        seed=args.seed
     )